@@ -1,10 +1,11 @@
-import asyncio
 import logging
+import time
 from typing import Any, List, Dict
 
 from workflow import Step, Workflow, Runner, TaskExecutor
 
 from models import UserInput, GreetingOutput, ProcessedOutput   
+from simulation import run, simulate_work
 
 # Configure logging
 logging.basicConfig(
@@ -23,54 +24,58 @@ class LoggingExecutor(TaskExecutor):
     
     async def execute_task(self, func, *args, **kwargs) -> Any:
         """Execute a single task with logging."""
+        # Skip the timing and message formatting when the records would be dropped
+        if not logger.isEnabledFor(self.log_level):
+            return await super().execute_task(func, *args, **kwargs)
+        
         func_name = getattr(func, "__name__", str(func))
-        logger.log(self.log_level, f"Starting task {func_name}")
+        logger.log(self.log_level, "Starting task %s", func_name)
         
-        start_time = asyncio.get_event_loop().time()
+        start_time = time.perf_counter()
         result = await super().execute_task(func, *args, **kwargs)
-        end_time = asyncio.get_event_loop().time()
+        execution_time = time.perf_counter() - start_time
         
-        execution_time = end_time - start_time
-        logger.log(self.log_level, f"Completed task {func_name} in {execution_time:.2f}s")
+        logger.log(self.log_level, "Completed task %s in %.2fs", func_name, execution_time)
         
         return result
     
     async def execute_tasks_parallel(self, tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Execute multiple tasks in parallel with logging."""
+        if not logger.isEnabledFor(self.log_level):
+            return await super().execute_tasks_parallel(tasks)
+        
         task_ids = [task["id"] for task in tasks]
-        logger.log(self.log_level, f"Starting parallel execution of {len(tasks)} tasks: {task_ids}")
+        logger.log(self.log_level, "Starting parallel execution of %d tasks: %s", len(tasks), task_ids)
         
-        start_time = asyncio.get_event_loop().time()
+        start_time = time.perf_counter()
         results = await super().execute_tasks_parallel(tasks)
-        end_time = asyncio.get_event_loop().time()
+        execution_time = time.perf_counter() - start_time
         
-        execution_time = end_time - start_time
-        logger.log(self.log_level, f"Completed parallel execution in {execution_time:.2f}s")
+        logger.log(self.log_level, "Completed parallel execution in %.2fs", execution_time)
         
         return results
 
 # Define step functions
 async def create_greeting(input_data: UserInput) -> GreetingOutput:
     """Generate a personalized greeting."""
-    await asyncio.sleep(1)  # Simulate processing time
+    await simulate_work(1)  # Simulate processing time
     message = f"Hello {input_data.name}, you are {input_data.age} years old!"
     return GreetingOutput(message=message)
 
 async def process_data(input_data: GreetingOutput) -> ProcessedOutput:
     """Process the greeting into a structured format."""
-    await asyncio.sleep(1)  # Simulate processing time
-    words = input_data.message.split()
+    await simulate_work(1)  # Simulate processing time
     return ProcessedOutput(
         original_message=input_data.message,
-        processed_data=words
+        processed_data=list(input_data.words)
     )
 
 async def analyze_greeting(input_data: GreetingOutput) -> dict:
     """Analyze the greeting message."""
-    await asyncio.sleep(1)  # Simulate processing time
+    await simulate_work(1)  # Simulate processing time
     
     char_count = len(input_data.message)
-    word_count = len(input_data.message.split())
+    word_count = len(input_data.words)
     
     return {
         "character_count": char_count,
@@ -139,4 +144,4 @@ async def main():
     print("=" * 50)
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run(main())
\ No newline at end of file
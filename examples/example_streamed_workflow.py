@@ -1,48 +1,42 @@
-import asyncio
-from typing import Dict
-from pydantic import BaseModel
+import sys
 
 from workflow import (
     Step, Workflow, Runner
 )
 
-# Define input and output models
-class UserData(BaseModel):
-    name: str
-    age: int
-    location: str
+from models import (
+    UserData, NameOutput, AgeOutput, LocationOutput, ParallelResults, FinalOutput
+)
+from simulation import run, simulate_work
+
+# Countries treated as northern by process_location
+_NORTHERN_COUNTRIES = frozenset({"Canada", "Norway", "Sweden", "Finland", "Russia"})
 
-class NameOutput(BaseModel):
-    formatted_name: str
+# Region labels indexed by LocationOutput.is_northern
+_REGIONS = ("Not Northern", "Northern")
 
-class AgeOutput(BaseModel):
-    age_category: str
-    years_to_100: int
+# Line printed between streamed events
+_SEPARATOR = "=" * 100
 
-class LocationOutput(BaseModel):
-    country: str
-    is_northern: bool
+# Number of events written to stdout at once
+_FLUSH_EVERY = 16
 
-class FinalOutput(BaseModel):
-    name_info: str
-    age_info: str
-    location_info: str
+# Age categories indexed by the number of thresholds (18, 65) the age reaches
+_AGE_CATEGORIES = ("child", "adult", "senior")
 
 # Define step functions
 async def process_name(input_data: UserData) -> NameOutput:
     """Process the user's name."""
-    await asyncio.sleep(1)  # Simulate processing time
+    await simulate_work(1)  # Simulate processing time
     name_parts = input_data.name.split()
     formatted = f"{name_parts[-1].upper()}, {name_parts[0]}"
     return NameOutput(formatted_name=formatted)
 
 async def process_age(input_data: UserData) -> AgeOutput:
     """Process the user's age."""
-    await asyncio.sleep(2)  # Simulate processing time
+    await simulate_work(2)  # Simulate processing time
     
-    category = "child" if input_data.age < 18 else (
-        "senior" if input_data.age >= 65 else "adult"
-    )
+    category = _AGE_CATEGORIES[(input_data.age >= 18) + (input_data.age >= 65)]
     
     years_to_100 = 100 - input_data.age
     
@@ -53,23 +47,22 @@ async def process_age(input_data: UserData) -> AgeOutput:
 
 async def process_location(input_data: UserData) -> LocationOutput:
     """Process the user's location."""
-    await asyncio.sleep(1.5)  # Simulate processing time
+    await simulate_work(1.5)  # Simulate processing time
     
     # Simplified logic for example
-    northern_countries = ["Canada", "Norway", "Sweden", "Finland", "Russia"]
-    is_northern = input_data.location in northern_countries
+    is_northern = input_data.location in _NORTHERN_COUNTRIES
     
     return LocationOutput(
         country=input_data.location,
         is_northern=is_northern
     )
 
-async def combine_results(input_data: Dict[str, any]) -> FinalOutput:
+async def combine_results(input_data: ParallelResults) -> FinalOutput:
     """Combine results from parallel steps."""
-    # The input will be a dictionary with step IDs as keys
-    name_result = input_data["process_name"]
-    age_result = input_data["process_age"]
-    location_result = input_data["process_location"]
+    # The input has one field per parallel step, named after the step ID
+    name_result = input_data.process_name
+    age_result = input_data.process_age
+    location_result = input_data.process_location
     
     name_info = f"Name: {name_result.formatted_name}"
     
@@ -80,10 +73,11 @@ async def combine_results(input_data: Dict[str, any]) -> FinalOutput:
     
     location_info = (
         f"Location: {location_result.country}, "
-        f"{'Northern' if location_result.is_northern else 'Not Northern'} region"
+        f"{_REGIONS[location_result.is_northern]} region"
     )
     
-    return FinalOutput(
+    # The fields are strings built above, so there is nothing to validate
+    return FinalOutput.model_construct(
         name_info=name_info,
         age_info=age_info,
         location_info=location_info
@@ -121,7 +115,7 @@ combine_step = Step(
     id="combine_results",
     name="Combine Results",
     description="Combines the results from parallel processing",
-    input_schema=dict,  # Using dict as the schema for simplicity
+    input_schema=ParallelResults,
     output_schema=FinalOutput,
     func=combine_results,
 )
@@ -134,7 +128,9 @@ workflow = Workflow(
 )
 
 # Add steps to the workflow - parallel processing followed by combination
-workflow.parallel([name_step, age_step, location_step]).then(combine_step)
+workflow.parallel(
+    [name_step, age_step, location_step], result_type=ParallelResults
+).then(combine_step)
 
 
 # Run the workflow with event streaming
@@ -155,11 +151,19 @@ async def main():
     # Run the workflow with event streaming
     print("Starting workflow execution with event streaming...")
     
+    # Events are written in batches, or one at a time with --no-buffer
+    flush_every = 1 if "--no-buffer" in sys.argv else _FLUSH_EVERY
+    buffer = []
     result = None
-    async for event in runner.run_with_events(user_data):
-        print(event)
-        print("=" * 100)
-        result = event
+    try:
+        async for event in runner.run_with_events(user_data):
+            buffer.append(f"{event}\n{_SEPARATOR}\n")
+            if len(buffer) >= flush_every:
+                sys.stdout.writelines(buffer)
+                buffer.clear()
+            result = event
+    finally:
+        sys.stdout.writelines(buffer)
     
     # Print final summary
     if result:
@@ -167,4 +171,4 @@ async def main():
         print(result)
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run(main())
\ No newline at end of file
@@ -1,18 +1,15 @@
-import asyncio
 from pydantic import BaseModel
 from typing import List
 
 from workflow import Step, Workflow, Runner
 from models import UserInput, GreetingOutput, ProcessedOutput
+from simulation import run
 
 # Define input and output models
 class UserInput(BaseModel):
     name: str
     age: int
 
-class GreetingOutput(BaseModel):
-    message: str
-
 class ProcessedOutput(BaseModel):
     original_message: str
     processed_data: List[str]
@@ -25,11 +22,10 @@ async def create_greeting(input_data: UserInput) -> GreetingOutput:
 
 async def process_data(input_data: GreetingOutput) -> ProcessedOutput:
     """Process the greeting into a structured format."""
-    # Split the message into words
-    words = input_data.message.split()
+    # The greeting splits its words once, on first use
     return ProcessedOutput(
         original_message=input_data.message,
-        processed_data=words
+        processed_data=list(input_data.words)
     )
 
 # Create workflow steps
@@ -78,4 +74,4 @@ async def main():
     print(f"Processed words: {result.processed_data}")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run(main())
\ No newline at end of file
@@ -1,16 +1,20 @@
-import asyncio
+import re
 
 from workflow import (
     Step, Workflow, Runner, 
 )
 
 from models import UserInput, GreetingOutput
+from simulation import run, simulate_work
+
+# Grammar of the greetings produced by create_greeting
+_GREETING_PATTERN = re.compile(r"^Hello (.+), you are (-?\d+) years old!$")
 
 # Define step functions
 async def create_greeting(input_data: UserInput) -> GreetingOutput:
     """Generate a personalized greeting."""
     # Simulate some processing time
-    await asyncio.sleep(1)
+    await simulate_work(1)
     message = f"Hello {input_data.name}, you are {input_data.age} years old!"
     return GreetingOutput(message=message)
 
@@ -18,11 +22,11 @@ async def analyze_data(input_data: GreetingOutput) -> dict:
     """Analyze the greeting data."""
     # Simulate some processing time
     print("Analyzing data...")
-    await asyncio.sleep(20)
+    await simulate_work(20)
     
     # Count characters and words
     char_count = len(input_data.message)
-    word_count = len(input_data.message.split())
+    word_count = len(input_data.words)
     
     return {
         "character_count": char_count,
@@ -34,14 +38,12 @@ async def translate_greeting(input_data: GreetingOutput) -> dict:
     """Translate the greeting to Spanish."""
     # Simulate some processing time
     print("Translating greeting...")
-    await asyncio.sleep(20)
+    await simulate_work(20)
     
     # Simple translation logic for demonstration
-    parts = input_data.message.split(", ")
-    if len(parts) == 2:
-        name_part = parts[0].replace("Hello ", "Hola ")
-        age_part = parts[1].replace("you are ", "tienes ").replace(" years old!", " años!")
-        spanish = f"{name_part}, {age_part}"
+    match = _GREETING_PATTERN.match(input_data.message)
+    if match:
+        spanish = f"Hola {match[1]}, tienes {match[2]} años!"
     else:
         spanish = "Hola!"
     
@@ -111,4 +113,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run(main())
\ No newline at end of file
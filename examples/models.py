@@ -1,3 +1,7 @@
+from dataclasses import dataclass
+from functools import cached_property
+from typing import NamedTuple
+
 from pydantic import BaseModel
 
 # Example models used in examples - these would typically be defined by the user
@@ -10,7 +14,54 @@ class GreetingOutput(BaseModel):
     """Greeting output model for workflow examples."""
     message: str
 
+    @cached_property
+    def words(self) -> tuple[str, ...]:
+        """
+        The message split into words once, for the steps that consume it.
+        
+        A plain cached property rather than a computed field, so it isn't part of
+        the model's serialized output.
+        """
+        return tuple(self.message.split())
+
 class ProcessedOutput(BaseModel):
     """Processed output model for workflow examples."""
     original_message: str
-    processed_data: list[str] 
\ No newline at end of file
+    processed_data: list[str]
+
+class UserData(BaseModel):
+    """User data model for the parallel workflow examples."""
+    name: str
+    age: int
+    location: str
+
+# Step outputs are built by the steps themselves and only consumed by
+# combine_results, so they are plain dataclasses instead of validated models
+@dataclass
+class NameOutput:
+    """Name processing output for the parallel workflow examples."""
+    formatted_name: str
+
+@dataclass
+class AgeOutput:
+    """Age processing output for the parallel workflow examples."""
+    age_category: str
+    years_to_100: int
+
+@dataclass
+class LocationOutput:
+    """Location processing output for the parallel workflow examples."""
+    country: str
+    is_northern: bool
+
+class ParallelResults(NamedTuple):
+    """Results of the parallel steps, one field per step ID."""
+    process_name: NameOutput
+    process_age: AgeOutput
+    process_location: LocationOutput
+
+class FinalOutput(BaseModel):
+    """Combined output model for the parallel workflow examples."""
+    name_info: str
+    age_info: str
+    location_info: str
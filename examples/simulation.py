@@ -0,0 +1,23 @@
+import asyncio
+import os
+from typing import Any, Coroutine
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional
+    uvloop = None
+
+# Set WF_SIMULATE=0 to skip the simulated processing time, e.g. when profiling the engine
+SIMULATE = os.getenv("WF_SIMULATE", "1") == "1"
+
+async def simulate_work(seconds: float) -> None:
+    """Wait for ``seconds`` to simulate processing time, unless simulation is disabled."""
+    if SIMULATE:
+        await asyncio.sleep(seconds)
+
+
+def run(main: Coroutine[Any, Any, Any]) -> Any:
+    """Run the example's ``main`` coroutine, on uvloop's faster event loop when it is installed."""
+    if uvloop is not None:
+        return uvloop.run(main)
+    return asyncio.run(main)
@@ -31,5 +31,6 @@ setup(
     ],
     extras_require={
         "celery": ["celery>=5.0.0"],
+        "uvloop": ["uvloop>=0.18.0"],
     },
 ) 
\ No newline at end of file
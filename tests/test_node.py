@@ -0,0 +1,58 @@
+import asyncio
+import unittest
+
+from pydantic import BaseModel
+
+from workflow import Runner, Workflow
+from workflow.event import EventType, StepCompletedEvent, StepStartedEvent
+from workflow.models import StepContext
+from workflow.node import WorkflowNode
+
+
+class Data(BaseModel):
+    x: int
+
+
+class IncrementNode(WorkflowNode):
+    """A node written against the original two-argument node methods."""
+
+    async def execute(self, context: StepContext, executor=None):
+        return Data(x=context.input_data.x + 1)
+
+    async def execute_with_events(self, context: StepContext, executor=None):
+        yield StepStartedEvent(
+            workflow_name=context.workflow_name, step_id="increment", step_name="Increment",
+            input_data=context.input_data,
+        ), None
+        result = await self.execute(context, executor)
+        yield StepCompletedEvent(
+            workflow_name=context.workflow_name, step_id="increment", step_name="Increment",
+            output_data=result,
+        ), result
+
+
+def build_workflow() -> Workflow:
+    workflow = Workflow(name="Test", input_schema=Data)
+    workflow.nodes.extend([IncrementNode(), IncrementNode()])
+    return workflow
+
+
+class CustomNodeTest(unittest.TestCase):
+    """Custom nodes only need to implement execute and execute_with_events."""
+
+    def test_run(self):
+        result = asyncio.run(Runner(build_workflow()).run({"x": 1}))
+        self.assertEqual(result, Data(x=3))
+
+    def test_run_with_events(self):
+        async def collect():
+            return [event async for event in Runner(build_workflow()).run_with_events({"x": 1})]
+
+        events = asyncio.run(collect())
+        self.assertEqual(events[-1].type, EventType.WORKFLOW_COMPLETED)
+        self.assertEqual(events[-1].output_data, Data(x=3))
+        self.assertEqual([event.type for event in events].count(EventType.STEP_COMPLETED), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
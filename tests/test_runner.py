@@ -0,0 +1,317 @@
+import asyncio
+import unittest
+
+from pydantic import BaseModel
+
+from workflow import AsyncIOExecutor, EventType, Runner, Step, StepCache, Workflow
+from workflow.runner import _never_suspends
+
+
+class Input(BaseModel):
+    x: int
+
+
+class Output(BaseModel):
+    y: int
+
+
+async def as_dict(data: Input) -> dict:
+    return {"y": str(data.x)}
+
+
+def build_workflow(**step_options) -> Workflow:
+    step = Step(
+        id="as_dict",
+        name="As Dict",
+        func=as_dict,
+        input_schema=Input,
+        output_schema=Output,
+        **step_options,
+    )
+    return Workflow(name="Test", input_schema=Input).then(step)
+
+
+def run(workflow: Workflow, input_data, cache: StepCache = None) -> object:
+    return asyncio.run(Runner(workflow, cache=cache).run(input_data))
+
+
+class StepOutputTest(unittest.TestCase):
+    """Step outputs are built when the step runs through a Runner."""
+
+    def test_untrusted_output_is_validated(self):
+        result = run(build_workflow(), {"x": 5})
+        self.assertEqual(result, Output(y=5))
+
+    def test_trusted_output_is_constructed_without_validation(self):
+        result = run(build_workflow(trusted=True), {"x": 5})
+        self.assertIsInstance(result, Output)
+        self.assertEqual(result.y, "5")
+
+    def test_raw_output_is_passed_on_as_is(self):
+        result = run(build_workflow(return_raw=True), {"x": 5})
+        self.assertEqual(result, {"y": "5"})
+
+    def test_parallel_outputs_are_built(self):
+        steps = [
+            Step(id=f"as_dict_{index}", name="As Dict", func=as_dict,
+                 input_schema=Input, output_schema=Output)
+            for index in range(2)
+        ]
+        workflow = Workflow(name="Test", input_schema=Input).parallel(steps)
+        result = run(workflow, {"x": 5})
+        self.assertEqual(result, {"as_dict_0": Output(y=5), "as_dict_1": Output(y=5)})
+
+
+
+class Opaque:
+    """A result that can't be serialized to JSON."""
+
+
+async def opaque(data: Input) -> Opaque:
+    return Opaque()
+
+
+async def double(x: int) -> int:
+    return x * 2
+
+
+async def double_later(x: int) -> int:
+    await asyncio.sleep(0)
+    return x * 2
+
+
+async def fail(x: int) -> int:
+    raise ValueError(x)
+
+
+def parallel_tasks(*funcs) -> list:
+    return [{"id": str(index), "func": func, "args": [index]} for index, func in enumerate(funcs)]
+
+
+class InlineTaskTest(unittest.TestCase):
+    """Parallel tasks that never await are run without the event loop."""
+
+    def test_never_suspending_tasks_finish_without_the_loop(self):
+        self.assertTrue(_never_suspends(double))
+        coroutine = AsyncIOExecutor().execute_tasks_parallel(parallel_tasks(double, double))
+        with self.assertRaises(StopIteration) as stop:
+            coroutine.send(None)
+        self.assertEqual(stop.exception.value, {"0": 0, "1": 2})
+
+    def test_suspending_tasks_are_scheduled(self):
+        self.assertFalse(_never_suspends(double_later))
+        results = asyncio.run(
+            AsyncIOExecutor().execute_tasks_parallel(parallel_tasks(double_later, double, double_later))
+        )
+        self.assertEqual(list(results.items()), [("0", 0), ("1", 2), ("2", 4)])
+
+    def test_inline_exception_is_raised(self):
+        self.assertTrue(_never_suspends(fail))
+        with self.assertRaises(ValueError):
+            asyncio.run(AsyncIOExecutor().execute_tasks_parallel(parallel_tasks(double, fail)))
+
+
+class DefaultCacheTest(unittest.TestCase):
+    """The cache a runner creates for itself."""
+
+    def test_default_cache_is_bounded(self):
+        runner = Runner(build_workflow())
+        self.assertEqual(runner.cache.max_size, Runner.DEFAULT_CACHE_SIZE)
+
+
+class StoreCacheTest(unittest.TestCase):
+    """Results cached in an external store."""
+
+    def test_hit_returns_the_same_shape_as_a_miss(self):
+        for step_options in ({}, {"return_raw": True}, {"trusted": True}):
+            with self.subTest(**step_options):
+                workflow = build_workflow(cacheable=True, **step_options)
+                cache = StepCache(store={})
+                miss = run(workflow, {"x": 5}, cache)
+                hit = run(workflow, {"x": 5}, cache)
+                self.assertEqual(len(cache), 1)
+                self.assertEqual(type(hit), type(miss))
+                self.assertEqual(hit, miss)
+
+    def test_trusted_hit_is_not_validated(self):
+        workflow = build_workflow(cacheable=True, trusted=True)
+        cache = StepCache(store={})
+        run(workflow, {"x": 5}, cache)
+        hit = run(workflow, {"x": 5}, cache)
+        self.assertIsInstance(hit, Output)
+        self.assertEqual(hit.y, "5")
+
+    def test_unserializable_result_is_not_cached(self):
+        step = Step(id="opaque", name="Opaque", func=opaque, input_schema=Input, cacheable=True)
+        workflow = Workflow(name="Test", input_schema=Input).then(step)
+        cache = StepCache(store={})
+        self.assertIsInstance(run(workflow, {"x": 5}, cache), Opaque)
+        self.assertEqual(len(cache), 0)
+
+
+def dict_step(step_id: str, func) -> Step:
+    return Step(id=step_id, name=step_id, func=func, input_schema=dict, output_schema=dict)
+
+
+class DependencyTest(unittest.TestCase):
+    """Steps with declared dependencies start as soon as those have finished."""
+
+    def build_workflow(self, branch) -> Workflow:
+        """Build start -> (waiting, branch) -> join, where waiting only returns once branch has."""
+        self.branch_done = None
+        self.cancelled = []
+
+        async def start(data: Input) -> dict:
+            self.branch_done = asyncio.Event()
+            return {"x": data.x}
+
+        async def waiting(data: dict) -> dict:
+            try:
+                await self.branch_done.wait()
+            except asyncio.CancelledError:
+                self.cancelled.append("waiting")
+                raise
+            return {"waiting": data["x"]}
+
+        async def notify(data: dict) -> dict:
+            result = await branch(data)
+            self.branch_done.set()
+            return result
+
+        async def join(data: dict) -> dict:
+            return {key: data[key] for key in sorted(data)}
+
+        return (
+            Workflow(name="Test", input_schema=Input)
+            .then(Step(id="start", name="start", func=start, input_schema=Input, output_schema=dict))
+            .then(dict_step("waiting", waiting))
+            .then(dict_step("branch", notify), depends_on=["start"])
+            .then(dict_step("join", join), depends_on=["waiting", "branch"])
+        )
+
+    def run_workflow(self, workflow: Workflow) -> object:
+        async def main():
+            return await asyncio.wait_for(Runner(workflow).run({"x": 5}), timeout=1)
+
+        return asyncio.run(main())
+
+    def test_branch_runs_alongside_previous_step(self):
+        async def branch(data: dict) -> dict:
+            return {"branch": data["x"]}
+
+        result = self.run_workflow(self.build_workflow(branch))
+        self.assertEqual(result, {"branch": {"branch": 5}, "waiting": {"waiting": 5}})
+
+    def test_failing_branch_cancels_the_other_branches(self):
+        async def branch(data: dict) -> dict:
+            raise RuntimeError("branch failed")
+
+        with self.assertRaisesRegex(RuntimeError, "branch failed"):
+            self.run_workflow(self.build_workflow(branch))
+        self.assertEqual(self.cancelled, ["waiting"])
+
+
+class ParallelRunTest(unittest.TestCase):
+    """Parallel steps run concurrently within their limits."""
+
+    def test_completion_events_follow_finish_order(self):
+        async def main():
+            first_done = asyncio.Event()
+            second_done = asyncio.Event()
+
+            async def first(data: Input) -> dict:
+                first_done.set()
+                return {}
+
+            async def second(data: Input) -> dict:
+                await first_done.wait()
+                second_done.set()
+                return {}
+
+            async def third(data: Input) -> dict:
+                await second_done.wait()
+                return {}
+
+            steps = [
+                Step(id=step_id, name=step_id, func=func, input_schema=Input, output_schema=dict)
+                for step_id, func in (("third", third), ("second", second), ("first", first))
+            ]
+            workflow = Workflow(name="Test", input_schema=Input).parallel(steps)
+            return [
+                event.step_id
+                async for event in Runner(workflow).run_with_events({"x": 5})
+                if event.type == EventType.STEP_COMPLETED
+            ]
+
+        self.assertEqual(asyncio.run(main()), ["first", "second", "third"])
+
+    def test_pool_limits_concurrent_steps(self):
+        running = 0
+        most_running = 0
+
+        async def pooled(data: Input) -> dict:
+            nonlocal running, most_running
+            running += 1
+            most_running = max(most_running, running)
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            running -= 1
+            return {}
+
+        steps = [
+            Step(id=f"pooled_{index}", name="Pooled", func=pooled, input_schema=Input,
+                 output_schema=dict, pool="limited")
+            for index in range(5)
+        ]
+        workflow = Workflow(name="Test", input_schema=Input).parallel(steps)
+        asyncio.run(Runner(workflow, pools={"limited": 2}).run({"x": 5}))
+        self.assertEqual(most_running, 2)
+
+    def test_failing_step_cancels_its_siblings(self):
+        cancelled = []
+
+        async def waiting(data: Input) -> dict:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append("waiting")
+                raise
+            return {}
+
+        async def failing(data: Input) -> dict:
+            await asyncio.sleep(0)
+            raise RuntimeError("step failed")
+
+        steps = [
+            Step(id="waiting", name="Waiting", func=waiting, input_schema=Input, output_schema=dict),
+            Step(id="failing", name="Failing", func=failing, input_schema=Input, output_schema=dict),
+        ]
+        workflow = Workflow(name="Test", input_schema=Input).parallel(steps)
+        with self.assertRaisesRegex(RuntimeError, "step failed"):
+            asyncio.run(asyncio.wait_for(Runner(workflow).run({"x": 5}), timeout=1))
+        self.assertEqual(cancelled, ["waiting"])
+
+
+class RunInputTest(unittest.TestCase):
+    """How the workflow input is validated."""
+
+    def test_run_many_returns_results_in_input_order(self):
+        results = asyncio.run(Runner(build_workflow()).run_many([Input(x=1), {"x": 2}, {"x": 3}]))
+        self.assertEqual(results, [Output(y=1), Output(y=2), Output(y=3)])
+
+    def test_run_without_validation_constructs_the_input(self):
+        received = []
+
+        async def record(data: Input) -> dict:
+            received.append(data)
+            return {}
+
+        step = Step(id="record", name="Record", func=record, input_schema=Input, output_schema=dict)
+        workflow = Workflow(name="Test", input_schema=Input).then(step)
+        asyncio.run(Runner(workflow).run({"x": "5"}, validate=False))
+        self.assertIsInstance(received[0], Input)
+        self.assertEqual(received[0].x, "5")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+import warnings
+
+from pydantic import BaseModel
+
+from workflow import Runner, Step, Workflow
+
+
+class Data(BaseModel):
+    x: int
+
+
+class AsyncCallable:
+    """A callable object whose ``__call__`` is async."""
+
+    async def __call__(self, data: Data) -> Data:
+        await asyncio.sleep(0)
+        return Data(x=data.x + 1)
+
+
+async def increment(data: Data) -> Data:
+    return Data(x=data.x + 1)
+
+
+def returns_coroutine(data: Data):
+    return increment(data)
+
+
+def double(data: Data) -> Data:
+    return Data(x=data.x * 2)
+
+
+def make_step(func, step_id: str = "step") -> Step:
+    return Step(id=step_id, name=step_id, func=func, input_schema=Data, output_schema=Data)
+
+
+class StepFunctionTest(unittest.TestCase):
+    """Async and synchronous step functions."""
+
+    def test_async_callable_object_is_awaited(self):
+        step = make_step(AsyncCallable())
+        self.assertEqual(asyncio.run(step.execute(Data(x=1))), Data(x=2))
+
+        workflow = Workflow(name="Test", input_schema=Data).then(step)
+        self.assertEqual(asyncio.run(Runner(workflow).run({"x": 1})), Data(x=2))
+
+    def test_sync_function_is_called_directly(self):
+        workflow = Workflow(name="Test", input_schema=Data).then(make_step(double))
+        self.assertEqual(asyncio.run(Runner(workflow).run({"x": 3})), Data(x=6))
+
+    def test_sync_function_returning_awaitable_is_rejected(self):
+        workflow = Workflow(name="Test", input_schema=Data)
+        workflow.parallel([make_step(returns_coroutine, "a"), make_step(double, "b")])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            with self.assertRaises(TypeError):
+                asyncio.run(make_step(returns_coroutine).execute(Data(x=1)))
+            with self.assertRaises(TypeError):
+                asyncio.run(Runner(workflow).run({"x": 1}))
+
+
+if __name__ == "__main__":
+    unittest.main()
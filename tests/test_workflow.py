@@ -0,0 +1,54 @@
+import unittest
+
+from pydantic import BaseModel
+
+from workflow import Step, Workflow
+
+
+class Data(BaseModel):
+    x: int
+
+
+async def identity(data: Data) -> Data:
+    return data
+
+
+def make_step(step_id: str) -> Step:
+    return Step(id=step_id, name=step_id, func=identity, input_schema=Data, output_schema=Data)
+
+
+class StepIdTest(unittest.TestCase):
+    """Reused step IDs are only rejected where a dependency would be ambiguous."""
+
+    def test_step_can_be_added_twice(self):
+        step = make_step("a")
+        workflow = Workflow(name="Test", input_schema=Data).then(step).then(step)
+        self.assertEqual(len(workflow.nodes), 2)
+
+    def test_depending_on_reused_id_is_rejected(self):
+        step = make_step("a")
+        workflow = Workflow(name="Test", input_schema=Data).then(step).then(step)
+        with self.assertRaises(ValueError):
+            workflow.then(make_step("b"), depends_on=["a"])
+
+    def test_reusing_depended_on_id_is_rejected(self):
+        step = make_step("a")
+        workflow = Workflow(name="Test", input_schema=Data).then(step)
+        workflow.then(make_step("b"), depends_on=["a"])
+        with self.assertRaises(ValueError):
+            workflow.then(step)
+
+
+class InputSchemaTest(unittest.TestCase):
+    """The input validator is only built when a run needs it."""
+
+    def test_unsupported_schema_can_be_constructed(self):
+        class Opaque:
+            pass
+
+        workflow = Workflow(name="Test", input_schema=Opaque)
+        self.assertIs(workflow.input_schema, Opaque)
+
+
+if __name__ == "__main__":
+    unittest.main()
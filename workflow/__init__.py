@@ -10,6 +10,7 @@ execution backends (AsyncIO, Celery, etc.)
 from workflow.step import Step
 from workflow.workflow import Workflow
 from workflow.models import StepContext
+from workflow.cache import StepCache
 
 # Runners
 from workflow.runner import (
@@ -21,13 +22,14 @@ from workflow.runner import (
 from workflow.event import (
     Event, EventType,
     StepStartedEvent, StepCompletedEvent,
+    ParallelStartedEvent, ParallelCompletedEvent,
     WorkflowStartedEvent, WorkflowCompletedEvent,
     WorkflowFailedEvent
 )
 
 __all__ = [
     # Core components
-    "Step", "Workflow", "StepContext",
+    "Step", "Workflow", "StepContext", "StepCache",
     
     # Runners
     "Runner",
@@ -38,6 +40,7 @@ __all__ = [
     # Events
     "Event", "EventType",
     "StepStartedEvent", "StepCompletedEvent",
+    "ParallelStartedEvent", "ParallelCompletedEvent",
     "WorkflowStartedEvent", "WorkflowCompletedEvent",
     "WorkflowFailedEvent",
 ] 
\ No newline at end of file
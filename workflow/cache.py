@@ -0,0 +1,101 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, MutableMapping, Optional, Tuple
+
+from pydantic_core import PydanticSerializationError, to_json
+
+from workflow.step import Step
+
+
+class StepCache:
+    """
+    Cache of step results.
+    
+    Results are keyed by the step ID and a digest of the JSON serialization of
+    the step's input, so a cached step executed again with identical input
+    returns the stored result without running.
+    
+    By default results are kept in memory as-is, so steps should not mutate the
+    data they receive. An external key-value store can be used instead, in which
+    case results are stored as JSON and built into the step's output schema when
+    they are read back, exactly like the results the step returns itself.
+    """
+    
+    def __init__(
+        self,
+        store: Optional[MutableMapping[str, bytes]] = None,
+        max_size: Optional[int] = None,
+    ):
+        """
+        Initialize a step cache.
+        
+        Args:
+            store: A mutable mapping from string keys to JSON bytes used to persist
+                results, e.g. a shelve or a thin wrapper around a Redis client.
+                Results are kept in memory when omitted.
+            max_size: Maximum number of results kept in memory; the least recently
+                used results are evicted first. Unbounded when omitted.
+        """
+        self._store = store
+        self.max_size = max_size
+        self._results: "OrderedDict[str, Any]" = OrderedDict()
+    
+    def key(self, step: Step, input_data: Any) -> Optional[str]:
+        """
+        Get the cache key for a step and its input.
+        
+        Returns:
+            The cache key, or None if the input can't be serialized
+        """
+        try:
+            serialized_input = to_json(input_data)
+        except PydanticSerializationError:
+            return None
+        return f"{step.id}:{hashlib.blake2b(serialized_input, digest_size=16).hexdigest()}"
+    
+    def get(self, step: Step, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a cached step result.
+        
+        Returns:
+            A ``(hit, result)`` tuple
+        """
+        if self._store is None:
+            if key in self._results:
+                if self.max_size is not None:
+                    self._results.move_to_end(key)
+                return True, self._results[key]
+            return False, None
+        
+        raw = self._store.get(key)
+        if raw is None:
+            return False, None
+        # Build the stored data the way the step builds its own results, so hits and
+        # misses agree: raw results stay plain JSON data and trusted results aren't validated
+        return True, step._build_output(json.loads(raw))
+    
+    def set(self, step: Step, key: str, result: Any) -> None:
+        """Store a step result; results that can't be serialized aren't cached."""
+        if self._store is None:
+            self._results[key] = result
+            if self.max_size is not None:
+                self._results.move_to_end(key)
+                while len(self._results) > self.max_size:
+                    self._results.popitem(last=False)
+        else:
+            try:
+                serialized_result = to_json(result)
+            except PydanticSerializationError:
+                return
+            self._store[key] = serialized_result
+    
+    def __len__(self) -> int:
+        return len(self._results if self._store is None else self._store)
+    
+    def clear(self) -> None:
+        """Remove all cached results."""
+        if self._store is None:
+            self._results.clear()
+        else:
+            self._store.clear()
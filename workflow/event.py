@@ -1,11 +1,14 @@
+import time
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, List, Optional
 from pydantic import BaseModel, Field
 
 class EventType(Enum):
     """Types of events that can be emitted during workflow execution."""
     STEP_STARTED = "step_started"
     STEP_COMPLETED = "step_completed"
+    PARALLEL_STARTED = "parallel_started"
+    PARALLEL_COMPLETED = "parallel_completed"
     WORKFLOW_STARTED = "workflow_started"
     WORKFLOW_COMPLETED = "workflow_completed"
     WORKFLOW_FAILED = "workflow_failed"
@@ -14,7 +17,7 @@ class Event(BaseModel):
     """Base class for all workflow events."""
     type: EventType
     workflow_name: str
-    timestamp: float = Field(default_factory=lambda: __import__('time').time())
+    timestamp: float = Field(default_factory=time.time)
 
 # Step events
 class StepEvent(Event):
@@ -33,6 +36,23 @@ class StepCompletedEvent(StepEvent):
     output_data: Any = None
     execution_time: float = 0.0
 
+# Parallel group events
+class ParallelEvent(Event):
+    """Base class for events related to a group of parallel steps."""
+    step_ids: List[str]
+    step_names: List[str]
+
+class ParallelStartedEvent(ParallelEvent):
+    """Event emitted once when a group of parallel steps starts execution."""
+    type: EventType = EventType.PARALLEL_STARTED
+    input_data: Any = None
+
+class ParallelCompletedEvent(ParallelEvent):
+    """Event emitted once when all steps of a parallel group complete execution."""
+    type: EventType = EventType.PARALLEL_COMPLETED
+    output_data: Any = None
+    execution_time: float = 0.0
+
 # Workflow events
 class WorkflowEvent(Event):
     """Base class for events related to workflow execution."""
@@ -1,7 +1,12 @@
+import sys
+from dataclasses import dataclass, field
 from typing import Dict, Any
-from pydantic import BaseModel
 
-class StepContext(BaseModel):
+# Slotted dataclasses are only available on Python 3.10+
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
+class StepContext:
     """
     Context object passed to steps during execution.
     
@@ -9,9 +14,12 @@ class StepContext(BaseModel):
     - The input data for the current step
     - Results from previously executed steps
     - The initial input data for the workflow
+    
+    The context is built by the runner from data it already validated, so it is
+    a plain dataclass rather than a validated model.
     """
     input_data: Any
-    step_results: Dict[str, Any] = {}
+    step_results: Dict[str, Any] = field(default_factory=dict)
     initial_data: Any = None
     workflow_name: str = ""
     
@@ -1,21 +1,122 @@
-from typing import Any, Dict, List, AsyncGenerator, Sequence
+from typing import Any, Callable, Dict, FrozenSet, List, AsyncGenerator, Optional, Sequence, Tuple
+import asyncio
+import functools
+import inspect
 import time
 
 from workflow.models import StepContext
 from workflow.event import (
-    Event, StepStartedEvent, StepCompletedEvent
+    Event, StepStartedEvent, StepCompletedEvent,
+    ParallelStartedEvent, ParallelCompletedEvent
 )
 from workflow.step import Step
+from workflow.cache import StepCache
+
+
+def _pooled(func: Callable, step: Step, pools: Optional[Dict[str, asyncio.Semaphore]]) -> Callable:
+    """
+    Gate a step's function by the semaphore of the step's pool.
+    
+    Steps without a pool, or whose pool has no configured limit, run ungated.
+    """
+    if pools is None or step.pool is None or step.pool not in pools:
+        return func
+    semaphore = pools[step.pool]
+    
+    @functools.wraps(func)
+    async def gated(*args, **kwargs):
+        async with semaphore:
+            return await func(*args, **kwargs)
+    
+    return gated
+
+
+def _notifying(func: Callable, step: Step, on_done: Optional[Callable[[Step, Any], None]]) -> Callable:
+    """Build a step's output and report it to ``on_done`` as soon as its function returns."""
+    if on_done is None:
+        return func
+    
+    @functools.wraps(func)
+    async def notifying(*args, **kwargs):
+        result = step._build_output(await func(*args, **kwargs))
+        on_done(step, result)
+        return result
+    
+    return notifying
+
+
+def _accepts_cache_and_pools(method: Callable) -> bool:
+    """Check whether a node method takes the cache and pools after the executor."""
+    parameters = inspect.signature(method).parameters.values()
+    if any(parameter.kind is inspect.Parameter.VAR_POSITIONAL for parameter in parameters):
+        return True
+    positional = [
+        parameter for parameter in parameters
+        if parameter.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    ]
+    # self, context, executor, cache and pools
+    return len(positional) >= 5
+
+
+def _without_cache_and_pools(method: Callable) -> Callable:
+    """Adapt a node method written as ``method(context, executor=None)`` to the runner's call."""
+    @functools.wraps(method)
+    def adapted(self, context: StepContext, executor=None, cache=None, pools=None):
+        return method(self, context, executor)
+    
+    return adapted
 
 
 class WorkflowNode:
-    """Base class for a node in the workflow execution graph."""
+    """
+    Base class for a node in the workflow execution graph.
+    
+    Subclasses implement ``execute`` and ``execute_with_events``, which the runner
+    calls with the step context, executor, step cache and pool semaphores. Methods
+    that only take the context and executor are still supported; they are called
+    without the cache and pools, so their steps are neither cached nor pooled.
+    """
     
-    async def execute(self, context: StepContext, executor=None) -> Any:
+    __slots__ = ()
+    
+    # IDs of the steps this node consumes; None means the output of the previous node
+    depends_on: Optional[Tuple[str, ...]] = None
+    
+    # IDs of the steps whose results are cached in this workflow, see Workflow.cache_stage
+    cached_step_ids: FrozenSet[str] = frozenset()
+    
+    # IDs of the steps executed by this node, which later steps can depend on
+    step_ids: Sequence[str] = ()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in ("execute", "execute_with_events"):
+            method = cls.__dict__.get(name)
+            if method is not None and not _accepts_cache_and_pools(method):
+                setattr(cls, name, _without_cache_and_pools(method))
+    
+    def __init__(self, depends_on: Optional[Sequence[str]] = None):
+        self.depends_on = tuple(depends_on) if depends_on is not None else None
+        self.cached_step_ids = frozenset()
+    
+    def _cache_key(self, step: Step, context: StepContext, cache: Optional[StepCache]) -> Optional[str]:
+        """Get the cache key for a step's result, or None if it isn't cached."""
+        if cache is None or not (step.cacheable or step.id in self.cached_step_ids):
+            return None
+        return cache.key(step, context.input_data)
+    
+    def store_results(self, result: Any, step_results: Dict[str, Any]) -> None:
+        """
+        Store the result of this node in the step results, by step ID.
+        
+        Nodes without step IDs store nothing.
+        """
+    
+    async def execute(self, context: StepContext, executor=None, cache: Optional[StepCache] = None, pools: Optional[Dict[str, asyncio.Semaphore]] = None) -> Any:
         """Execute this node and return the result."""
         raise NotImplementedError("Subclasses must implement execute")
     
-    async def execute_with_events(self, context: StepContext, executor=None) -> AsyncGenerator[tuple[Event, Any], None]:
+    async def execute_with_events(self, context: StepContext, executor=None, cache: Optional[StepCache] = None, pools: Optional[Dict[str, asyncio.Semaphore]] = None) -> AsyncGenerator[tuple[Event, Any], None]:
         """Execute this node and yield events along with the updated data."""
         raise NotImplementedError("Subclasses must implement execute_with_events")
 
@@ -23,37 +124,70 @@ class WorkflowNode:
 class StepNode(WorkflowNode):
     """A workflow node that represents a single step execution."""
     
-    def __init__(self, step: Step):
+    __slots__ = ("step", "depends_on", "cached_step_ids")
+    
+    def __init__(self, step: Step, depends_on: Optional[Sequence[str]] = None):
+        super().__init__(depends_on)
         self.step = step
     
-    async def execute(self, context: StepContext, executor=None) -> Any:
+    @property
+    def step_ids(self) -> List[str]:
+        """IDs of the steps executed by this node."""
+        return [self.step.id]
+    
+    def store_results(self, result: Any, step_results: Dict[str, Any]) -> None:
+        """Store the result of the step in the step results."""
+        step_results[self.step.id] = result
+    
+    async def execute(self, context: StepContext, executor=None, cache: Optional[StepCache] = None, pools: Optional[Dict[str, asyncio.Semaphore]] = None) -> Any:
         """Execute the step and return its result."""
-        if executor:
-            result = await executor.execute_task(self.step.func, context.input_data)
+        key = self._cache_key(self.step, context, cache)
+        if key is not None:
+            hit, result = cache.get(self.step, key)
+            if hit:
+                return result
+        
+        if executor and getattr(executor, "_passthrough", False):
+            # Skip the executor's wrapper coroutine when it only awaits the task
+            if self.step._is_async:
+                result = await _pooled(self.step.func, self.step, pools)(context.input_data)
+            else:
+                # Synchronous steps never yield to the loop, so pools can't be exceeded
+                result = self.step._check_sync_result(self.step.func(context.input_data))
+            result = self.step._build_output(result)
+        elif executor:
+            result = await executor.execute_task(_pooled(self.step._async_func, self.step, pools), context.input_data)
+            result = self.step._build_output(result)
         else:
-            result = await self.step.execute(context.input_data)
+            result = await _pooled(self.step.execute, self.step, pools)(context.input_data)
+        
+        if key is not None:
+            cache.set(self.step, key, result)
         return result
     
-    async def execute_with_events(self, context: StepContext, executor=None) -> AsyncGenerator[tuple[Event, Any], None]:
+    async def execute_with_events(self, context: StepContext, executor=None, cache: Optional[StepCache] = None, pools: Optional[Dict[str, asyncio.Semaphore]] = None) -> AsyncGenerator[tuple[Event, Any], None]:
         """Execute the step and yield execution events."""
         step = self.step
         step_start_time = time.time()
+        start_counter = time.perf_counter()
         
         # Emit step started event
-        yield (StepStartedEvent(
+        yield (StepStartedEvent.model_construct(
             workflow_name=context.workflow_name,
+            timestamp=step_start_time,
             step_id=step.id,
             step_name=step.name,
             input_data=context.input_data,
         ), context.input_data)
         
         # Execute the step
-        result = await self.execute(context, executor)
+        result = await self.execute(context, executor, cache, pools)
                 
         # Emit step completed event
-        step_execution_time = time.time() - step_start_time
-        yield (StepCompletedEvent(
+        step_execution_time = time.perf_counter() - start_counter
+        yield (StepCompletedEvent.model_construct(
             workflow_name=context.workflow_name,
+            timestamp=step_start_time + step_execution_time,
             step_id=step.id,
             step_name=step.name,
             output_data=result,
@@ -64,56 +198,208 @@ class StepNode(WorkflowNode):
 class ParallelNode(WorkflowNode):
     """A workflow node that represents parallel execution of multiple steps."""
     
-    def __init__(self, steps: Sequence[Step]):
+    __slots__ = ("steps", "result_type", "emit_per_step", "depends_on", "cached_step_ids")
+    
+    def __init__(self, steps: Sequence[Step], result_type: Optional[type] = None, emit_per_step: bool = True):
+        super().__init__()
         self.steps = steps
+        self.result_type = result_type
+        self.emit_per_step = emit_per_step
+    
+    @property
+    def step_ids(self) -> List[str]:
+        """IDs of the steps executed by this node."""
+        return [step.id for step in self.steps]
+    
+    def store_results(self, result: Any, step_results: Dict[str, Any]) -> None:
+        """Store the result of each step in the step results."""
+        if self.result_type is None:
+            step_results.update(result)
+        else:
+            for step in self.steps:
+                step_results[step.id] = getattr(result, step.id)
+    
+    def _build_result(self, results: Dict[str, Any]) -> Any:
+        """Build the node's output from the step results, as a ``result_type`` instance if set."""
+        if self.result_type is None:
+            return results
+        return self.result_type(**results)
+    
+    async def execute(self, context: StepContext, executor=None, cache: Optional[StepCache] = None, pools: Optional[Dict[str, asyncio.Semaphore]] = None) -> Any:
+        """Execute all steps in parallel and return their results."""
+        results = await self._execute_results(context, executor, cache, pools)
+        return self._build_result(results)
     
-    async def execute(self, context: StepContext, executor=None) -> Dict[str, Any]:
-        """Execute all steps in parallel and return a dictionary of results."""
+    async def _execute_results(
+        self,
+        context: StepContext,
+        executor=None,
+        cache: Optional[StepCache] = None,
+        pools: Optional[Dict[str, asyncio.Semaphore]] = None,
+        on_done: Optional[Callable[[Step, Any], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute all steps in parallel and return a dictionary of results.
+        
+        ``on_done`` is called with each step and its result as soon as the step
+        completes, when given.
+        """
+        if cache is None:
+            return await self._execute_steps(self.steps, context, executor, pools, on_done)
+        
+        # Reuse cached results and only execute the remaining steps
+        cached_results = {}
+        keys = {}
+        pending_steps = []
+        for step in self.steps:
+            key = self._cache_key(step, context, cache)
+            if key is not None:
+                hit, result = cache.get(step, key)
+                if hit:
+                    cached_results[step.id] = result
+                    if on_done is not None:
+                        on_done(step, result)
+                    continue
+            keys[step.id] = key
+            pending_steps.append(step)
+        
+        executed_results = await self._execute_steps(pending_steps, context, executor, pools, on_done)
+        for step in pending_steps:
+            key = keys[step.id]
+            if key is not None:
+                cache.set(step, key, executed_results[step.id])
+        
+        return {
+            step.id: cached_results[step.id] if step.id in cached_results else executed_results[step.id]
+            for step in self.steps
+        }
+    
+    @staticmethod
+    async def _execute_steps(
+        steps: Sequence[Step],
+        context: StepContext,
+        executor=None,
+        pools: Optional[Dict[str, asyncio.Semaphore]] = None,
+        on_done: Optional[Callable[[Step, Any], None]] = None,
+    ) -> Dict[str, Any]:
+        """Execute the given steps in parallel and return a dictionary of results."""
+        if not steps:
+            return {}
+        
+        # Every step receives the same input
+        input_data = context.input_data
+        
         if executor:
             # Use the executor for parallel execution
+            args = (input_data,)
             parallel_tasks = [
                 {
                     "id": step.id,
-                    "func": step.func,
-                    "args": [context.input_data],
+                    "func": _notifying(_pooled(step._async_func, step, pools), step, on_done),
+                    "args": args,
                 }
-                for step in self.steps
+                for step in steps
             ]
-            return await executor.execute_tasks_parallel(parallel_tasks)
+            results = await executor.execute_tasks_parallel(parallel_tasks)
+            return {step.id: step._build_output(results[step.id]) for step in steps}
         else:
             # Fallback to sequential execution if no executor provided
             results = {}
-            for step in self.steps:
-                node = StepNode(step)
-                results[step.id] = await node.execute(context)
+            for step in steps:
+                results[step.id] = await _notifying(_pooled(step.execute, step, pools), step, on_done)(input_data)
             return results
     
-    async def execute_with_events(self, context: StepContext, executor=None) -> AsyncGenerator[tuple[Event, Any], None]:
+    async def execute_with_events(self, context: StepContext, executor=None, cache: Optional[StepCache] = None, pools: Optional[Dict[str, asyncio.Semaphore]] = None) -> AsyncGenerator[tuple[Event, Any], None]:
         """Execute all steps in parallel and yield execution events."""
+        if not self.emit_per_step:
+            async for item in self._execute_with_group_events(context, executor, cache, pools):
+                yield item
+            return
+        
         # Emit started events for all steps first
         for step in self.steps:
-            yield (StepStartedEvent(
+            yield (StepStartedEvent.model_construct(
                 workflow_name=context.workflow_name,
                 step_id=step.id,
                 step_name=step.name,
                 input_data=context.input_data,
             ), context.input_data)
         
-        # Execute all steps 
+        # Execute all steps in the background and emit each completed event as
+        # soon as its step finishes
         step_start_time = time.time()
-        results = await self.execute(context, executor)
-        step_execution_time = time.time() - step_start_time
+        start_counter = time.perf_counter()
+        finished: asyncio.Queue = asyncio.Queue()
+        execution = asyncio.ensure_future(self._execute_results(
+            context, executor, cache, pools,
+            on_done=lambda step, result: finished.put_nowait((step, result, time.perf_counter())),
+        ))
+        execution.add_done_callback(lambda _: finished.put_nowait(None))
         
-        # Emit completed events for all steps
+        completed_ids = set()
+        try:
+            while True:
+                item = await finished.get()
+                if item is None:
+                    break
+                step, result, end_counter = item
+                completed_ids.add(step.id)
+                step_execution_time = end_counter - start_counter
+                yield (StepCompletedEvent.model_construct(
+                    workflow_name=context.workflow_name,
+                    timestamp=step_start_time + step_execution_time,
+                    step_id=step.id,
+                    step_name=step.name,
+                    output_data=result,
+                    execution_time=step_execution_time
+                ), context.input_data)
+            results = await execution
+        finally:
+            execution.cancel()
+        
+        # Emit completed events for steps whose completion wasn't observed,
+        # e.g. steps run remotely by the executor
+        step_execution_time = time.perf_counter() - start_counter
         for step in self.steps:
-            result = results[step.id]
-            yield (StepCompletedEvent(
+            if step.id in completed_ids:
+                continue
+            yield (StepCompletedEvent.model_construct(
                 workflow_name=context.workflow_name,
+                timestamp=step_start_time + step_execution_time,
                 step_id=step.id,
                 step_name=step.name,
-                output_data=result,
+                output_data=results[step.id],
                 execution_time=step_execution_time
             ), context.input_data)
         
         # Return the collected results
-        yield (None, results) 
\ No newline at end of file
+        yield (None, self._build_result(results))
+    
+    async def _execute_with_group_events(self, context: StepContext, executor=None, cache: Optional[StepCache] = None, pools: Optional[Dict[str, asyncio.Semaphore]] = None) -> AsyncGenerator[tuple[Event, Any], None]:
+        """Execute all steps in parallel and yield one event for the whole group at each end."""
+        step_ids = self.step_ids
+        step_names = [step.name for step in self.steps]
+        
+        step_start_time = time.time()
+        start_counter = time.perf_counter()
+        yield (ParallelStartedEvent.model_construct(
+            workflow_name=context.workflow_name,
+            timestamp=step_start_time,
+            step_ids=step_ids,
+            step_names=step_names,
+            input_data=context.input_data,
+        ), context.input_data)
+        
+        results = await self._execute_results(context, executor, cache, pools)
+        
+        step_execution_time = time.perf_counter() - start_counter
+        yield (ParallelCompletedEvent.model_construct(
+            workflow_name=context.workflow_name,
+            timestamp=step_start_time + step_execution_time,
+            step_ids=step_ids,
+            step_names=step_names,
+            output_data=results,
+            execution_time=step_execution_time
+        ), context.input_data)
+        
+        yield (None, self._build_result(results))
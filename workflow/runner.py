@@ -1,17 +1,76 @@
+import dis
 import time
 import asyncio
-from typing import Any, AsyncGenerator, Dict, List, Optional
+import inspect
+import weakref
+from collections import deque
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Sequence
 
 from workflow.models import StepContext
+from workflow.cache import StepCache
+from workflow.step import _schema_adapter
 from workflow.workflow import Workflow
-from workflow.node import StepNode, ParallelNode
+from workflow.node import WorkflowNode
 from workflow.event import (
     Event, WorkflowStartedEvent, WorkflowCompletedEvent, WorkflowFailedEvent
 )
 
+# Opcodes of the constructs that can suspend a coroutine (await, async for, async with)
+_SUSPENDING_OPNAMES = frozenset({
+    "GET_AWAITABLE", "GET_AITER", "GET_ANEXT", "BEFORE_ASYNC_WITH",
+    "YIELD_VALUE", "YIELD_FROM", "SEND",
+})
+
+
+@lru_cache(maxsize=1024)
+def _code_never_suspends(code) -> bool:
+    """Check whether code is a coroutine's and contains no suspension points."""
+    if not code.co_flags & inspect.CO_COROUTINE:
+        return False
+    return not any(
+        instruction.opname in _SUSPENDING_OPNAMES for instruction in dis.get_instructions(code)
+    )
+
+
+def _never_suspends(func) -> bool:
+    """
+    Check whether ``func`` is an async function that runs to completion without awaiting.
+    
+    The result is cached per code object, which is shared by every closure and
+    bound method created from the same function.
+    """
+    code = getattr(func, "__code__", None)
+    return code is not None and _code_never_suspends(code)
+
+
+# Structured concurrency for parallel tasks, available on Python 3.11+
+_TaskGroup = getattr(asyncio, "TaskGroup", None)
+
+
 class TaskExecutor:
     """Base class for workflow task execution backends."""
     
+    # Maximum number of tasks of a parallel group running at once; None means unbounded
+    max_concurrency: Optional[int] = None
+    
+    # Whether execute_task only awaits the task, so nodes may call it directly
+    _passthrough: bool = True
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._passthrough = cls.execute_task is TaskExecutor.execute_task
+    
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """
+        Initialize a task executor.
+        
+        Args:
+            max_concurrency: Maximum number of tasks of a parallel group running
+                at once, e.g. to stay within a connection pool. Unbounded when omitted.
+        """
+        self.max_concurrency = max_concurrency
+    
     async def execute_task(self, func, *args, **kwargs) -> Any:
         """Execute a single task using the executor."""
         return await func(*args, **kwargs)
@@ -19,7 +78,7 @@ class TaskExecutor:
     async def execute_tasks_parallel(self, tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Execute multiple tasks in parallel using the executor."""
         results = {}
-        coroutines = []
+        pending = []
         
         for task in tasks:
             task_id = task["id"]
@@ -27,21 +86,61 @@ class TaskExecutor:
             args = task.get("args", [])
             kwargs = task.get("kwargs", {})
             
-            coroutines.append(self._run_and_store(task_id, func, args, kwargs))
+            if _never_suspends(func):
+                # Tasks that never await are run inline instead of being scheduled
+                results[task_id] = self._run_inline(func, args, kwargs)
+            else:
+                results[task_id] = None  # Keeps the results in task order
+                pending.append((task_id, func, args, kwargs))
         
-        # Run all coroutines in parallel
-        completed = await asyncio.gather(*coroutines)
+        if not pending:
+            return results
         
-        # Store results by task ID
-        for task_id, result in completed:
-            results[task_id] = result
-            
+        if self.max_concurrency is not None and len(pending) > self.max_concurrency:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            pending = [
+                (task_id, self._bounded, (semaphore, func, args, kwargs), {})
+                for task_id, func, args, kwargs in pending
+            ]
+        
+        if _TaskGroup is None:
+            # Run all coroutines in parallel
+            completed = await asyncio.gather(*(func(*args, **kwargs) for _, func, args, kwargs in pending))
+            for (task_id, _, _, _), result in zip(pending, completed):
+                results[task_id] = result
+            return results
+        
+        # A task group cancels the remaining tasks as soon as one of them fails
+        try:
+            async with _TaskGroup() as group:
+                running = [
+                    (task_id, group.create_task(func(*args, **kwargs)))
+                    for task_id, func, args, kwargs in pending
+                ]
+        except ExceptionGroup as error:
+            # Raise the failure itself, as gather does, rather than the group
+            raise error.exceptions[0] from None
+        
+        for task_id, running_task in running:
+            results[task_id] = running_task.result()
         return results
     
-    async def _run_and_store(self, task_id: str, func, args, kwargs) -> tuple:
-        """Helper method to run a task and return its ID with the result."""
-        result = await func(*args, **kwargs)
-        return (task_id, result)
+    @staticmethod
+    async def _bounded(semaphore: asyncio.Semaphore, func, args, kwargs) -> Any:
+        """Run a task once the semaphore limiting the group's concurrency admits it."""
+        async with semaphore:
+            return await func(*args, **kwargs)
+    
+    @staticmethod
+    def _run_inline(func, args, kwargs) -> Any:
+        """Run a coroutine function that never awaits to completion without the event loop."""
+        coroutine = func(*args, **kwargs)
+        try:
+            coroutine.send(None)
+        except StopIteration as stop:
+            return stop.value
+        coroutine.close()
+        raise RuntimeError(f"Task {getattr(func, '__name__', func)} suspended while run inline")
 
 
 class AsyncIOExecutor(TaskExecutor):
@@ -52,75 +151,310 @@ class AsyncIOExecutor(TaskExecutor):
 class Runner:
     """Base class for workflow execution runners."""
     
-    def __init__(self, workflow: Workflow, executor: Optional[TaskExecutor] = None):
+    # Number of results kept by the cache a runner creates when none is given
+    DEFAULT_CACHE_SIZE = 1024
+    
+    def __init__(
+        self,
+        workflow: Workflow,
+        executor: Optional[TaskExecutor] = None,
+        cache: Optional[StepCache] = None,
+        pools: Optional[Dict[str, int]] = None,
+    ):
         """
         Initialize a workflow runner.
         
         Args:
             workflow: The workflow to run
             executor: The task executor to use (defaults to AsyncIOExecutor)
+            cache: The cache for results of cacheable steps, which can be shared
+                between runners (defaults to a new StepCache keeping the
+                DEFAULT_CACHE_SIZE most recently used results)
+            pools: Maximum number of concurrently running steps per pool name.
+                Steps in a pool without a limit are not gated.
         """
         self.workflow = workflow
         self.executor = executor or AsyncIOExecutor()
+        self.cache = cache if cache is not None else StepCache(max_size=self.DEFAULT_CACHE_SIZE)
+        self.pools = dict(pools or {})
+        # Semaphores are bound to the event loop they are used on, so each loop gets its own
+        self._pool_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _get_pool_semaphores(self) -> Optional[Dict[str, asyncio.Semaphore]]:
+        """
+        Get the semaphores enforcing the pool limits.
+        
+        The semaphores are created on first use within each event loop and shared
+        by every run of this runner on that loop.
+        """
+        if not self.pools:
+            return None
+        loop = asyncio.get_running_loop()
+        semaphores = self._pool_semaphores.get(loop)
+        if semaphores is None:
+            semaphores = self._pool_semaphores[loop] = {
+                name: asyncio.Semaphore(size) for name, size in self.pools.items()
+            }
+        return semaphores
+
+    def _validate_input(self, input_data: Any) -> Any:
+        """
+        Validate the workflow input against the workflow's input schema.
+        
+        Raw JSON (``str`` or ``bytes``) is parsed and validated in a single pass;
+        other objects are validated as Python data. The schema can be a Pydantic
+        model or any type Pydantic can validate, such as a dataclass.
+        """
+        input_schema = self.workflow.input_schema
+        if isinstance(input_data, input_schema):
+            return input_data
+        validator = self.workflow._input_adapter.validator
+        if isinstance(input_data, (str, bytes, bytearray)):
+            return validator.validate_json(input_data)
+        return validator.validate_python(input_data)
+
+    def _construct_input(self, input_data: Any) -> Any:
+        """
+        Build the workflow input without validating it.
+        
+        Objects are used as is; dictionaries are turned into an instance of the
+        input schema with ``model_construct`` (or the plain constructor for
+        dataclass schemas).
+        """
+        if not isinstance(input_data, dict):
+            return input_data
+        input_schema = self.workflow.input_schema
+        construct = getattr(input_schema, "model_construct", input_schema)
+        return construct(**input_data)
+
+    @staticmethod
+    def _node_input(
+        index: int,
+        node: WorkflowNode,
+        validated_input: Any,
+        node_results: Dict[int, Any],
+        step_results: Dict[str, Any],
+    ) -> Any:
+        """Get the input data for a node from the results of its dependencies."""
+        if node.depends_on is None:
+            return node_results[index - 1] if index else validated_input
+        if not node.depends_on:
+            return validated_input
+        if len(node.depends_on) == 1:
+            return step_results[node.depends_on[0]]
+        return {step_id: step_results[step_id] for step_id in node.depends_on}
+
+    async def _execute_node(
+        self,
+        node: WorkflowNode,
+        context: StepContext,
+        executor: TaskExecutor,
+        cache: StepCache,
+        pools: Optional[Dict[str, asyncio.Semaphore]],
+        emit: Optional[Callable[[Event], Awaitable[None]]] = None,
+    ) -> Any:
+        """
+        Execute a node and store its results in the context's step results.
+        
+        The node's events are passed to ``emit`` and awaited, when given.
+        
+        Returns:
+            The result of the node
+        """
+        if emit is None:
+            result = await node.execute(context, executor, cache, pools)
+        else:
+            result = None
+            async for event, data in node.execute_with_events(context, executor, cache, pools):
+                if event is not None:
+                    await emit(event)
+                result = data
+        
+        node.store_results(result, context.step_results)
+        return result
 
-    async def run(self, input_data: Any) -> Any:
+    async def _run_sequential(
+        self,
+        nodes: Sequence[WorkflowNode],
+        validated_input: Any,
+        step_results: Dict[str, Any],
+    ) -> Any:
+        """
+        Execute the nodes in sequence, each consuming the result of the previous one.
+        
+        Returns:
+            The result of the last node
+        """
+        # Reuse one context since a single node runs at a time
+        executor = self.executor
+        cache = self.cache
+        pools = self._get_pool_semaphores()
+        current_data = validated_input
+        context = StepContext(
+            input_data=current_data,
+            step_results=step_results,
+            initial_data=validated_input,
+            workflow_name=self.workflow.name
+        )
+        for node in nodes:
+            context.input_data = current_data
+            current_data = await self._execute_node(node, context, executor, cache, pools)
+        return current_data
+
+    async def _run_graph(
+        self,
+        validated_input: Any,
+        step_results: Dict[str, Any],
+        emit: Optional[Callable[[Event], Awaitable[None]]] = None,
+    ) -> Any:
+        """
+        Execute the workflow nodes as a dependency graph.
+        
+        Every node is dispatched as soon as all the nodes it depends on have
+        completed, rather than after the node added before it.
+        
+        Returns:
+            The result of the last node of the workflow
+        """
+        plan = self.workflow._compile()
+        nodes = plan.nodes
+        in_degree = list(plan.in_degree)
+        
+        node_results: Dict[int, Any] = {}
+        ready = deque(index for index, degree in enumerate(in_degree) if degree == 0)
+        running: Dict[asyncio.Future, int] = {}
+        executor = self.executor
+        cache = self.cache
+        pools = self._get_pool_semaphores()
+        try:
+            while ready or running:
+                # Dispatch every node whose dependencies have all completed
+                while ready:
+                    index = ready.popleft()
+                    node = nodes[index]
+                    context = StepContext(
+                        input_data=self._node_input(
+                            index, node, validated_input, node_results, step_results
+                        ),
+                        step_results=step_results,
+                        initial_data=validated_input,
+                        workflow_name=self.workflow.name
+                    )
+                    task = asyncio.ensure_future(self._execute_node(node, context, executor, cache, pools, emit))
+                    running[task] = index
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = running.pop(task)
+                    node_results[index] = task.result()
+                    
+                    # Release the nodes that were only waiting for this one
+                    for dependent in plan.dependents[index]:
+                        in_degree[dependent] -= 1
+                        if in_degree[dependent] == 0:
+                            ready.append(dependent)
+        finally:
+            for task in running:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Retrieve the failures of other nodes, only the first one is raised
+                    task.exception()
+        
+        return node_results[len(nodes) - 1]
+
+    async def _stream_graph(
+        self,
+        validated_input: Any,
+        step_results: Dict[str, Any],
+    ) -> AsyncGenerator[tuple[Optional[Event], Any], None]:
+        """
+        Execute the workflow as a dependency graph and yield step events as they occur.
+        
+        Yields ``(event, None)`` tuples for step events and a final ``(None, result)``
+        tuple with the result of the last node.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        graph = asyncio.ensure_future(
+            self._run_graph(validated_input, step_results, events.put)
+        )
+        graph.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield (event, None)
+            yield (None, await graph)
+        finally:
+            graph.cancel()
+
+    async def run(self, input_data: Any, *, validate: bool = True) -> Any:
         """
         Run the workflow synchronously and return the final result.
         
         Args:
-            input_data: The input data for the workflow
+            input_data: The input data for the workflow, either an object or raw JSON
+            validate: Whether to validate the input; pass False for input produced
+                by trusted code, which must then be an object or a dictionary
             
         Returns:
             The final output data from the workflow
         """
         # Validate input data
         validated_input = (
-            self.workflow.input_schema.model_validate(input_data)
-            if not isinstance(input_data, self.workflow.input_schema)
-            else input_data
+            self._validate_input(input_data) if validate else self._construct_input(input_data)
         )
         
+        return await self._run_validated(validated_input)
+    
+    async def run_many(self, inputs: Sequence[Any]) -> List[Any]:
+        """
+        Run the workflow for several inputs concurrently and return the final results.
+        
+        The inputs are validated together, in a single pass over the whole batch.
+        
+        Args:
+            inputs: The input data for each run, as objects or dictionaries
+            
+        Returns:
+            The final output data of each run, in the order of the inputs
+        """
+        validated_inputs = _schema_adapter(List[self.workflow.input_schema]).validate_python(inputs)
+        
+        return list(await asyncio.gather(
+            *(self._run_validated(validated_input) for validated_input in validated_inputs)
+        ))
+    
+    async def _run_validated(self, validated_input: Any) -> Any:
+        """Run the workflow on already validated input and return the final result."""
         # Initialize step results storage
         step_results = {}
         
-        # Process each node in sequence
-        current_data = validated_input
-        for node in self.workflow.nodes:
-            context = StepContext(
-                input_data=current_data,
-                step_results=step_results,
-                initial_data=validated_input,
-                workflow_name=self.workflow.name
-            )
-            
-            # Execute the node
-            result = await node.execute(context, self.executor)
-
-            current_data = result
-            
-            # Store step results
-            if isinstance(node, StepNode):
-                step_results[node.step.id] = result
-            elif isinstance(node, ParallelNode) and isinstance(result, dict):
-                step_results.update(result)
+        # Nodes with explicit dependencies are scheduled as a graph
+        plan = self.workflow._compile()
+        if not plan.sequential:
+            return await self._run_graph(validated_input, step_results)
         
-        return current_data
+        return await self._run_sequential(plan.nodes, validated_input, step_results)
     
-    async def run_with_events(self, input_data: Any) -> AsyncGenerator[Event, None]:
+    async def run_with_events(self, input_data: Any, *, validate: bool = True) -> AsyncGenerator[Event, None]:
         """
         Run the workflow and stream events about the execution progress.
         
         Args:
-            input_data: The input data for the workflow
+            input_data: The input data for the workflow, either an object or raw JSON
+            validate: Whether to validate the input; pass False for input produced
+                by trusted code, which must then be an object or a dictionary
             
         Yields:
             Event objects indicating the progress of the workflow execution
         """
         # Validate input data
         validated_input = (
-            self.workflow.input_schema.model_validate(input_data)
-            if not isinstance(input_data, self.workflow.input_schema)
-            else input_data
+            self._validate_input(input_data) if validate else self._construct_input(input_data)
         )
         
         # Initialize step results storage
@@ -128,48 +462,61 @@ class Runner:
         
         # Emit workflow started event
         start_time = time.time()
-        yield WorkflowStartedEvent(
+        start_counter = time.perf_counter()
+        yield WorkflowStartedEvent.model_construct(
             workflow_name=self.workflow.name,
+            timestamp=start_time,
             input_data=validated_input
         )
         
         try:
-            # Process each node in sequence
             current_data = validated_input
-            for node in self.workflow.nodes:
+            plan = self.workflow._compile()
+            if not plan.sequential:
+                # Nodes with explicit dependencies are scheduled as a graph
+                async for event, data in self._stream_graph(validated_input, step_results):
+                    if event is not None:
+                        yield event
+                    else:
+                        current_data = data
+            else:
+                # Process each node in sequence, only as fast as the events are
+                # consumed, reusing one context since a single node runs at a time
+                executor = self.executor
+                cache = self.cache
+                pools = self._get_pool_semaphores()
                 context = StepContext(
                     input_data=current_data,
                     step_results=step_results,
                     initial_data=validated_input,
                     workflow_name=self.workflow.name
                 )
-
-                # Execute the node with events
-                async for event, data in node.execute_with_events(context, self.executor):
-                    if event is not None:
+                for node in plan.nodes:
+                    context.input_data = current_data
+                    
+                    # Execute the node with events
+                    async for event, data in node.execute_with_events(context, executor, cache, pools):
                         current_data = data
-                        yield event
-                    else:
-                        current_data = data
-            
-                # Store step results
-                if isinstance(node, StepNode):
-                    step_results[node.step.id] = current_data
-                elif isinstance(node, ParallelNode) and isinstance(current_data, dict):
-                    step_results.update(current_data)
+                        if event is not None:
+                            yield event
+                    
+                    # Store step results
+                    node.store_results(current_data, step_results)
             
             # Emit workflow completed event
-            total_execution_time = time.time() - start_time
-            yield WorkflowCompletedEvent(
+            total_execution_time = time.perf_counter() - start_counter
+            yield WorkflowCompletedEvent.model_construct(
                 workflow_name=self.workflow.name,
+                timestamp=start_time + total_execution_time,
                 output_data=current_data,
                 execution_time=total_execution_time
             )
         except Exception as e:
             # Emit workflow failed event
-            total_execution_time = time.time() - start_time
-            yield WorkflowFailedEvent(
+            total_execution_time = time.perf_counter() - start_counter
+            yield WorkflowFailedEvent.model_construct(
                 workflow_name=self.workflow.name,
+                timestamp=start_time + total_execution_time,
                 error=str(e),
                 execution_time=total_execution_time
             )
@@ -1,7 +1,52 @@
 import inspect
-from typing import Any, Callable, Type, Optional
+import sys
+from functools import cached_property, lru_cache, wraps
+from typing import Any, Callable, Tuple, Type, Optional
+
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    from typing import is_typeddict
+except ImportError:  # Python < 3.10
+    from typing_extensions import is_typeddict
+
+@lru_cache(maxsize=1024)
+def _schema_adapter(schema: Any) -> TypeAdapter:
+    """
+    Get the validator for a schema, built once and shared by every step using it.
+    
+    The cache is bounded so that dynamically created schemas aren't kept alive
+    forever; steps and workflows keep the validators they use themselves.
+    """
+    return TypeAdapter(schema)
+
+
+@lru_cache(maxsize=1024)
+def _inspect_func(func: Callable) -> Tuple[bool, int]:
+    """
+    Check whether a step function is async and count its parameters.
+    
+    Callable objects are async when their ``__call__`` is. Signature inspection is
+    slow, so the result is cached for functions shared by several steps.
+    """
+    is_async = (
+        inspect.iscoroutinefunction(func)
+        or inspect.iscoroutinefunction(getattr(type(func), "__call__", None))
+    )
+    return is_async, len(inspect.signature(func).parameters)
+
+
+def _as_async(step: "Step") -> Callable:
+    """Wrap a synchronous step function for callers that await the function."""
+    func = step.func
+    check_result = step._check_sync_result
+    
+    @wraps(func)
+    async def call(input_data):
+        return check_result(func(input_data))
+    
+    return call
 
-from pydantic import BaseModel
 
 class Step:
     """
@@ -21,37 +66,115 @@ class Step:
         id: str,
         output_schema: Optional[Type] = None,
         description: str = "",
+        trusted: bool = False,
+        cacheable: bool = False,
+        pool: Optional[str] = None,
+        return_raw: bool = False,
     ):
         """
         Initialize a step.
         
         Args:
             name: The name of the step
-            func: The async function to execute for this step
-            input_schema: The Pydantic model for validating the input
+            func: The function to execute for this step, either async or synchronous;
+                synchronous functions run on the event loop and should be quick
+            input_schema: The Pydantic model (or dataclass) for validating the input
             id: ID for the step
-            output_schema: The Pydantic model for validating the output, optional
+            output_schema: The Pydantic model (or dataclass) for validating the output,
+                or a TypedDict for internal data that doesn't need validation, optional
             description: A description of what the step does
+            trusted: Whether the step's output can be built without validation
+            cacheable: Whether results can be reused for identical input, for
+                deterministic steps without side effects
+            pool: Name of the runner pool limiting how many steps of this kind
+                run concurrently, optional
+            return_raw: Whether the step's result is passed on exactly as returned,
+                without building an instance of the output schema
         """
         self.name = name
         self.func = func
         self.input_schema = input_schema
         self.output_schema = output_schema
         self.description = description
-        self.id = id
+        # Interned so that result lookups by step ID compare by identity
+        self.id = sys.intern(id)
+        self.trusted = trusted
+        self.cacheable = cacheable
+        self.pool = pool
+        self.return_raw = return_raw
+        
+        # TypedDict schemas are plain dicts at runtime: they can't be used with
+        # isinstance and their instances are passed between steps unvalidated
+        self._input_type = dict if is_typeddict(input_schema) else input_schema
+        self._output_is_typeddict = output_schema is not None and is_typeddict(output_schema)
+        self._output_passthrough = (
+            return_raw or output_schema is None or self._output_is_typeddict
+        )
         
         # Validate function signature
         self._validate_func()
+        
+        # Synchronous functions are called directly by the step, and wrapped for
+        # executors, which await the function they're given
+        self._async_func = func if self._is_async else _as_async(self)
     
     def _validate_func(self) -> None:
         """Validate that the function has the correct signature."""
-        if not inspect.iscoroutinefunction(self.func):
-            raise ValueError(f"Step function '{self.name}' must be an async function")
+        try:
+            is_async, param_count = _inspect_func(self.func)
+        except TypeError:  # Unhashable callable
+            is_async, param_count = _inspect_func.__wrapped__(self.func)
+        
+        self._is_async = is_async
         
-        params = inspect.signature(self.func).parameters
-        if len(params) != 1:
+        if param_count != 1:
             raise ValueError(f"Step function '{self.name}' must accept exactly one parameter")
     
+    def _check_sync_result(self, result: Any) -> Any:
+        """
+        Check that a synchronous step function didn't hand back an awaitable.
+        
+        Such functions can't be told apart from synchronous ones before they run,
+        so they are rejected when they do instead of passing the awaitable on.
+        """
+        if inspect.isawaitable(result):
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
+            raise TypeError(
+                f"Step function '{self.name}' returned an awaitable; define it with async def"
+            )
+        return result
+    
+    @cached_property
+    def _validate_input(self) -> Callable[[Any], Any]:
+        """
+        Input validator, built on first use and reused on every execution.
+        
+        The adapter's core validator is called directly, skipping the adapter's
+        Python-level wrapper.
+        """
+        return _schema_adapter(self.input_schema).validator.validate_python
+    
+    @cached_property
+    def _validate_output(self) -> Callable[[Any], Any]:
+        """Output validator, built on first use and reused on every execution."""
+        return _schema_adapter(self.output_schema).validator.validate_python
+    
+    def _construct_output(self, result: Any) -> Any:
+        """
+        Build an instance of the output schema from a raw step result.
+        
+        Trusted steps produce data that is already type-correct, so the model is
+        built with ``model_construct`` (or the plain constructor for dataclass
+        schemas) and validation is skipped. Untrusted steps are validated against
+        the output schema.
+        """
+        if self.trusted and isinstance(result, dict):
+            construct = getattr(self.output_schema, "model_construct", self.output_schema)
+            return construct(**result)
+        return self._validate_output(result)
+    
     async def execute(self, input_data: Any) -> Any:
         """
         Execute the step function with the given input data.
@@ -64,18 +187,34 @@ class Step:
         """
         # Validate input data if it's not already an instance of input_schema
         validated_input = (
-            self.input_schema.model_validate(input_data)
-            if not isinstance(input_data, self.input_schema)
+            self._validate_input(input_data)
+            if not isinstance(input_data, self._input_type)
             else input_data
         )
         
         # Execute the step function
-        result = await self.func(validated_input)
+        if self._is_async:
+            result = await self.func(validated_input)
+        else:
+            result = self._check_sync_result(self.func(validated_input))
+        
+        return self._build_output(result)
+    
+    def _build_output(self, result: Any) -> Any:
+        """
+        Turn the raw result of the step function into the step's output.
+        
+        Results are passed on as is when the step has no output schema, returns raw
+        results or declares a TypedDict; otherwise they are built into an instance
+        of the output schema unless they already are one. Nodes that run the step
+        function through an executor call this on the function's result.
+        """
+        if self._output_passthrough:
+            return result
         
-        # Validate output if output_schema is provided
-        if self.output_schema is not None and not isinstance(result, self.output_schema):
+        if not isinstance(result, self.output_schema):
             # Only attempt validation for non-primitive types
             if isinstance(result, (dict, list)) or hasattr(result, "__dict__"):
-                result = self.output_schema.model_validate(result)
+                result = self._construct_output(result)
         
         return result 
\ No newline at end of file
@@ -1,7 +1,51 @@
-from typing import List, Type, Optional, Union, Sequence
-from pydantic import BaseModel
+import dataclasses
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Set, Type, Optional, Tuple, Union, Sequence
+from pydantic import BaseModel, TypeAdapter
+
+from workflow.step import Step, _schema_adapter
+
+if TYPE_CHECKING:
+    from workflow.node import WorkflowNode
+
+
+class ExecutionPlan(NamedTuple):
+    """
+    The dependency graph of a workflow's nodes.
+    
+    Nodes are referenced by their index in ``nodes``. The plan is compiled once
+    per workflow definition and reused by every run.
+    """
+    nodes: Tuple['WorkflowNode', ...]
+    dependencies: Tuple[Tuple[int, ...], ...]
+    dependents: Tuple[Tuple[int, ...], ...]
+    in_degree: Tuple[int, ...]
+    sequential: bool
+
+
+def _field_names(result_type: type) -> List[str]:
+    """Get the field names of a NamedTuple, dataclass or Pydantic model class."""
+    if hasattr(result_type, "_fields"):
+        return list(result_type._fields)
+    if dataclasses.is_dataclass(result_type):
+        return [field.name for field in dataclasses.fields(result_type)]
+    if hasattr(result_type, "model_fields"):
+        return list(result_type.model_fields)
+    raise TypeError(
+        f"Parallel result type {result_type} must be a NamedTuple, dataclass or Pydantic model"
+    )
+
+
+def _schemas_match(schema: Any, expected_schema: Any) -> bool:
+    """
+    Check whether a step's input schema matches the schema it consumes.
+    
+    Schemas are usually the very same class, so identity is checked first; the
+    equality fallback covers generic aliases such as ``list[str]``, which are
+    equal but distinct objects.
+    """
+    return schema is expected_schema or schema == expected_schema
 
-from workflow.step import Step
 
 class Workflow:
     """
@@ -31,43 +75,126 @@ class Workflow:
         self.input_schema = input_schema
         self.nodes = []
         self._last_step_output_schema = input_schema
+        self._step_output_schemas: Dict[str, Any] = {}
+        # IDs used by several steps, which can't be depended on, and IDs depended on
+        self._ambiguous_step_ids: Set[str] = set()
+        self._depended_step_ids: Set[str] = set()
+        self._plan: Optional[ExecutionPlan] = None
     
-    def __add_step(self, step: Step) -> 'Workflow':
+    @cached_property
+    def _input_adapter(self) -> TypeAdapter:
+        """
+        Input adapter, built on first use and reused on every run.
+        
+        Built lazily so that a workflow whose input schema Pydantic can't
+        handle can still be constructed, as long as it's never run with
+        validation.
+        """
+        return _schema_adapter(self.input_schema)
+    
+    def _register_step(self, step: Step) -> None:
+        """
+        Record a step's output schema so later steps can depend on it by ID.
+        
+        A step ID may be reused, e.g. by adding the same step twice, as long as no
+        step depends on it.
+        """
+        if step.id in self._step_output_schemas:
+            if step.id in self._depended_step_ids:
+                raise ValueError(
+                    f"Step ID '{step.id}' is already a dependency in workflow '{self.name}' "
+                    f"and can't be reused"
+                )
+            self._ambiguous_step_ids.add(step.id)
+        self._step_output_schemas[step.id] = step.output_schema
+    
+    def _dependencies_output_schema(self, step: Step, depends_on: Sequence[str]) -> Any:
+        """
+        Get the schema of the data a step receives from its declared dependencies.
+        
+        A step without dependencies receives the workflow input, a step with a single
+        dependency receives that step's result and a step with several dependencies
+        receives a dictionary mapping step IDs to their results.
+        """
+        for step_id in depends_on:
+            if step_id not in self._step_output_schemas:
+                raise ValueError(
+                    f"Step '{step.name}' depends on unknown step ID '{step_id}'"
+                )
+            if step_id in self._ambiguous_step_ids:
+                raise ValueError(
+                    f"Step '{step.name}' depends on step ID '{step_id}', which is used "
+                    f"by several steps in workflow '{self.name}'"
+                )
+        
+        if not depends_on:
+            return self.input_schema
+        if len(depends_on) == 1:
+            return self._step_output_schemas[depends_on[0]]
+        return dict
+    
+    def __add_step(self, step: Step, depends_on: Optional[Sequence[str]] = None) -> 'Workflow':
         """
         Add a single step to the workflow.
         
         Args:
             step: The step to add
+            depends_on: IDs of the steps whose results this step consumes. By default
+                the step consumes the output of the previous node.
             
         Returns:
             The workflow object for method chaining
         """
-        # Validate that the step's input schema matches the previous step's output schema
-        if step.input_schema != self._last_step_output_schema:
+        if depends_on is None:
+            expected_schema = self._last_step_output_schema
+            source = "previous step's output schema"
+        else:
+            depends_on = tuple(depends_on)
+            expected_schema = self._dependencies_output_schema(step, depends_on)
+            source = f"output schema of its dependencies {list(depends_on)}"
+        
+        # Validate that the step's input schema matches the output schema it consumes
+        if not _schemas_match(step.input_schema, expected_schema):
             raise ValueError(
                 f"Step '{step.name}' input schema {step.input_schema} "
-                f"doesn't match previous step's output schema {self._last_step_output_schema}"
+                f"doesn't match {source} {expected_schema}"
             )
         
+        self._register_step(step)
+        if depends_on:
+            self._depended_step_ids.update(depends_on)
+        
         # Add the step as a regular node
         from workflow.node import StepNode
-        self.nodes.append(StepNode(step))
+        self.nodes.append(StepNode(step, depends_on))
+        self._plan = None
         
         # Update the last step output schema
         self._last_step_output_schema = step.output_schema
         
         return self
     
-    def __add_parallel_steps(self, steps: Sequence[Step]) -> 'Workflow':
+    def __add_parallel_steps(
+        self,
+        steps: Sequence[Step],
+        result_type: Optional[type] = None,
+        emit_per_step: bool = True,
+    ) -> 'Workflow':
         """
         Add multiple steps to be executed in parallel.
         
         All steps must accept the same input schema (matching the previous step's output),
         but can have different output schemas. The output will be a dictionary mapping
-        step IDs to their results.
+        step IDs to their results, or an instance of ``result_type`` with one field per
+        step ID.
         
         Args:
             steps: The steps to add for parallel execution
+            result_type: A NamedTuple, dataclass or Pydantic model whose fields are the
+                step IDs, used as the output instead of a dictionary, optional
+            emit_per_step: Whether to emit started and completed events for every
+                step, rather than a single ParallelStartedEvent and
+                ParallelCompletedEvent for the whole group
             
         Returns:
             The workflow object for method chaining
@@ -75,28 +202,108 @@ class Workflow:
         if not steps:
             raise ValueError("No steps provided for parallel execution")
         
+        if result_type is not None:
+            step_ids = sorted(step.id for step in steps)
+            if sorted(_field_names(result_type)) != step_ids:
+                raise ValueError(
+                    f"Parallel result type {result_type} fields must match the step IDs {step_ids}"
+                )
+        
         # Validate that all steps have the same input schema, matching the previous step's output schema
+        expected_schema = self._last_step_output_schema
         for step in steps:
-            if step.input_schema != self._last_step_output_schema:
+            if not _schemas_match(step.input_schema, expected_schema):
                 raise ValueError(
                     f"Step '{step.name}' input schema {step.input_schema} "
-                    f"doesn't match previous step's output schema {self._last_step_output_schema}"
+                    f"doesn't match previous step's output schema {expected_schema}"
                 )
         
+        for step in steps:
+            self._register_step(step)
+        
         # Add the steps as a parallel node
         from workflow.node import ParallelNode
-        self.nodes.append(ParallelNode(steps))
+        self.nodes.append(ParallelNode(steps, result_type, emit_per_step))
+        self._plan = None
         
         # The output schema of a parallel node is a dict of step IDs to results
-        self._last_step_output_schema = dict
+        # unless a result type was given
+        self._last_step_output_schema = result_type or dict
         
         return self
     
+    def _compile(self) -> ExecutionPlan:
+        """
+        Compile the workflow's nodes into an execution plan.
+        
+        Nodes without explicit dependencies depend on the previous node. The plan
+        is cached until another step is added.
+        """
+        if self._plan is not None:
+            return self._plan
+        
+        node_index = {
+            step_id: index
+            for index, node in enumerate(self.nodes)
+            for step_id in node.step_ids
+        }
+        
+        dependencies = []
+        dependents: List[List[int]] = [[] for _ in self.nodes]
+        for index, node in enumerate(self.nodes):
+            if node.depends_on is None:
+                node_dependencies = (index - 1,) if index else ()
+            else:
+                node_dependencies = tuple(sorted({node_index[step_id] for step_id in node.depends_on}))
+            dependencies.append(node_dependencies)
+            for dependency in node_dependencies:
+                dependents[dependency].append(index)
+        
+        self._plan = ExecutionPlan(
+            nodes=tuple(self.nodes),
+            dependencies=tuple(dependencies),
+            dependents=tuple(tuple(node_dependents) for node_dependents in dependents),
+            in_degree=tuple(len(node_dependencies) for node_dependencies in dependencies),
+            sequential=all(node.depends_on is None for node in self.nodes),
+        )
+        return self._plan
+    
+    def cache_stage(self, step: Step) -> 'Workflow':
+        """
+        Cache the results of a step in this workflow.
+        
+        Marked steps are skipped when executed again with identical input and
+        their cached result is reused, like steps created with ``cacheable=True``.
+        This is useful for expensive intermediate stages whose input rarely
+        changes while later stages keep changing.
+        
+        Args:
+            step: A step already added to the workflow
+            
+        Returns:
+            The workflow object for method chaining
+        """
+        for node in self.nodes:
+            if step.id in node.step_ids:
+                node.cached_step_ids = node.cached_step_ids | {step.id}
+                return self
+        raise ValueError(f"Step '{step.name}' is not part of workflow '{self.name}'")
+    
     # Convenient aliases
-    def then(self, step: Step) -> 'Workflow':
-        """Alias for add_step."""
-        return self.__add_step(step)
+    def then(self, step: Step, depends_on: Optional[Sequence[str]] = None) -> 'Workflow':
+        """
+        Alias for add_step.
+        
+        Passing ``depends_on`` lets the step start as soon as the listed steps have
+        finished, instead of waiting for the previous node.
+        """
+        return self.__add_step(step, depends_on)
     
-    def parallel(self, steps: Sequence[Step]) -> 'Workflow':
+    def parallel(
+        self,
+        steps: Sequence[Step],
+        result_type: Optional[type] = None,
+        emit_per_step: bool = True,
+    ) -> 'Workflow':
         """Alias for add_parallel_steps."""
-        return self.__add_parallel_steps(steps)
\ No newline at end of file
+        return self.__add_parallel_steps(steps, result_type, emit_per_step)
\ No newline at end of file